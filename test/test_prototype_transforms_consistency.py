@@ -1,16 +1,20 @@
+import dataclasses
 import enum
+import importlib.util
 import inspect
 import random
 import re
+import types
 from collections import defaultdict
-from importlib.machinery import SourceFileLoader
 from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Sequence, Type
 
 import numpy as np
 import PIL.Image
 import pytest
 
 import torch
+from common_utils import cache
 from prototype_common_utils import (
     ArgsKwargs,
     assert_close,
@@ -30,33 +34,42 @@ from torchvision.prototype.transforms._utils import query_spatial_size
 from torchvision.prototype.transforms.functional import to_image_pil
 from torchvision.transforms import functional as legacy_F
 
-DEFAULT_MAKE_IMAGES_KWARGS = dict(color_spaces=[features.ColorSpace.RGB], extra_dims=[(4,)])
 
+# These keyword arguments are shared by most configs. Thus, they are read-only, including their values, to make sure one
+# config or test cannot change them for all others.
+DEFAULT_MAKE_IMAGES_KWARGS = types.MappingProxyType(dict(color_spaces=(features.ColorSpace.RGB,), extra_dims=((4,),)))
 
+
+@dataclasses.dataclass
 class ConsistencyConfig:
-    def __init__(
-        self,
-        prototype_cls,
-        legacy_cls,
-        # If no args_kwargs is passed, only the signature will be checked
-        args_kwargs=(),
-        make_images_kwargs=None,
-        supports_pil=True,
-        removed_params=(),
-        closeness_kwargs=None,
-    ):
-        self.prototype_cls = prototype_cls
-        self.legacy_cls = legacy_cls
-        self.args_kwargs = args_kwargs
-        self.make_images_kwargs = make_images_kwargs or DEFAULT_MAKE_IMAGES_KWARGS
-        self.supports_pil = supports_pil
-        self.removed_params = removed_params
-        self.closeness_kwargs = closeness_kwargs or dict(rtol=0, atol=0)
-
-
-# These are here since both the prototype and legacy transform need to be constructed with the same random parameters
-LINEAR_TRANSFORMATION_MEAN = torch.rand(36)
-LINEAR_TRANSFORMATION_MATRIX = torch.rand([LINEAR_TRANSFORMATION_MEAN.numel()] * 2)
+    prototype_cls: Type
+    legacy_cls: Type
+    # If no args_kwargs is passed, only the signature will be checked
+    args_kwargs: Sequence[ArgsKwargs] = ()
+    make_images_kwargs: Optional[Mapping[str, Any]] = None
+    supports_pil: bool = True
+    removed_params: Sequence[str] = ()
+    closeness_kwargs: Optional[Dict[str, Any]] = None
+
+    def __post_init__(self):
+        # A mapping proxy is shallow. Thus, we also need to convert the values into tuples to make them read-only.
+        self.make_images_kwargs = types.MappingProxyType(
+            {
+                name: tuple(value) if isinstance(value, list) else value
+                for name, value in (self.make_images_kwargs or DEFAULT_MAKE_IMAGES_KWARGS).items()
+            }
+        )
+        self.closeness_kwargs = self.closeness_kwargs or dict(rtol=0, atol=0)
+
+
+# These are here since both the prototype and legacy transform need to be constructed with the same random parameters.
+# We use a dedicated generator rather than the global RNG, so the values don't depend on which other modules were
+# collected before this one. This keeps them identical across processes, e.g. `pytest -n auto` workers.
+_LINEAR_TRANSFORMATION_GENERATOR = torch.Generator().manual_seed(0)
+LINEAR_TRANSFORMATION_MEAN = torch.rand(36, generator=_LINEAR_TRANSFORMATION_GENERATOR)
+LINEAR_TRANSFORMATION_MATRIX = torch.rand(
+    [LINEAR_TRANSFORMATION_MEAN.numel()] * 2, generator=_LINEAR_TRANSFORMATION_GENERATOR
+)
 
 CONSISTENCY_CONFIGS = [
     ConsistencyConfig(
@@ -471,10 +484,17 @@ def test_automatic_coverage():
         )
 
 
+# Signatures never change during a session, so there is no need to inspect the same object multiple times. Note that the
+# returned signature is shared and thus must not be modified.
+@cache
+def get_signature(obj):
+    return inspect.signature(obj)
+
+
 @pytest.mark.parametrize("config", CONSISTENCY_CONFIGS, ids=lambda config: config.legacy_cls.__name__)
 def test_signature_consistency(config):
-    legacy_params = dict(inspect.signature(config.legacy_cls).parameters)
-    prototype_params = dict(inspect.signature(config.prototype_cls).parameters)
+    legacy_params = dict(get_signature(config.legacy_cls).parameters)
+    prototype_params = dict(get_signature(config.prototype_cls).parameters)
 
     for param in config.removed_params:
         legacy_params.pop(param, None)
@@ -507,103 +527,123 @@ def test_signature_consistency(config):
     assert prototype_kinds == legacy_kinds
 
 
-def check_call_consistency(
-    prototype_transform, legacy_transform, images=None, supports_pil=True, closeness_kwargs=None
-):
-    if images is None:
-        images = make_images(**DEFAULT_MAKE_IMAGES_KWARGS)
+def check_single_image_consistency(prototype_transform, legacy_transform, image, *, supports_pil, closeness_kwargs):
+    image_repr = f"[{tuple(image.shape)}, {str(image.dtype).rsplit('.')[-1]}]"
 
-    closeness_kwargs = closeness_kwargs or dict()
+    # Every transform call below needs to start from the same RNG state. Restoring a snapshot is cheaper than reseeding.
+    torch.manual_seed(0)
+    rng_state = torch.get_rng_state()
 
-    for image in images:
-        image_repr = f"[{tuple(image.shape)}, {str(image.dtype).rsplit('.')[-1]}]"
+    image_tensor = image.as_subclass(torch.Tensor)
+    try:
+        torch.set_rng_state(rng_state)
+        output_legacy_tensor = legacy_transform(image_tensor)
+    except Exception as exc:
+        raise pytest.UsageError(
+            f"Transforming a tensor image {image_repr} failed in the legacy transform with the "
+            f"error above. This means that you need to specify the parameters passed to `make_images` through the "
+            "`make_images_kwargs` of the `ConsistencyConfig`."
+        ) from exc
+
+    try:
+        torch.set_rng_state(rng_state)
+        output_prototype_tensor = prototype_transform(image_tensor)
+    except Exception as exc:
+        raise AssertionError(
+            f"Transforming a tensor image with shape {image_repr} failed in the prototype transform with "
+            f"the error above. This means there is a consistency bug either in `_get_params` or in the "
+            f"`is_simple_tensor` path in `_transform`."
+        ) from exc
+
+    assert_close(
+        output_prototype_tensor,
+        output_legacy_tensor,
+        msg=lambda msg: f"Tensor image consistency check failed with: \n\n{msg}",
+        **closeness_kwargs,
+    )
+
+    try:
+        torch.set_rng_state(rng_state)
+        output_prototype_image = prototype_transform(image)
+    except Exception as exc:
+        raise AssertionError(
+            f"Transforming a feature image with shape {image_repr} failed in the prototype transform with "
+            f"the error above. This means there is a consistency bug either in `_get_params` or in the "
+            f"`features.Image` path in `_transform`."
+        ) from exc
+
+    assert_close(
+        output_prototype_image,
+        output_prototype_tensor,
+        msg=lambda msg: f"Output for feature and tensor images is not equal: \n\n{msg}",
+        **closeness_kwargs,
+    )
+
+    if image.ndim == 3 and supports_pil:
+        image_pil = to_image_pil(image)
 
-        image_tensor = torch.Tensor(image)
         try:
-            torch.manual_seed(0)
-            output_legacy_tensor = legacy_transform(image_tensor)
+            torch.set_rng_state(rng_state)
+            output_legacy_pil = legacy_transform(image_pil)
         except Exception as exc:
             raise pytest.UsageError(
-                f"Transforming a tensor image {image_repr} failed in the legacy transform with the "
-                f"error above. This means that you need to specify the parameters passed to `make_images` through the "
-                "`make_images_kwargs` of the `ConsistencyConfig`."
+                f"Transforming a PIL image with shape {image_repr} failed in the legacy transform with the "
+                f"error above. If this transform does not support PIL images, set `supports_pil=False` on the "
+                "`ConsistencyConfig`. "
             ) from exc
 
         try:
-            torch.manual_seed(0)
-            output_prototype_tensor = prototype_transform(image_tensor)
+            torch.set_rng_state(rng_state)
+            output_prototype_pil = prototype_transform(image_pil)
         except Exception as exc:
             raise AssertionError(
-                f"Transforming a tensor image with shape {image_repr} failed in the prototype transform with "
+                f"Transforming a PIL image with shape {image_repr} failed in the prototype transform with "
                 f"the error above. This means there is a consistency bug either in `_get_params` or in the "
-                f"`is_simple_tensor` path in `_transform`."
+                f"`PIL.Image.Image` path in `_transform`."
             ) from exc
 
         assert_close(
-            output_prototype_tensor,
-            output_legacy_tensor,
-            msg=lambda msg: f"Tensor image consistency check failed with: \n\n{msg}",
+            output_prototype_pil,
+            output_legacy_pil,
+            msg=lambda msg: f"PIL image consistency check failed with: \n\n{msg}",
             **closeness_kwargs,
         )
 
-        try:
-            torch.manual_seed(0)
-            output_prototype_image = prototype_transform(image)
-        except Exception as exc:
-            raise AssertionError(
-                f"Transforming a feature image with shape {image_repr} failed in the prototype transform with "
-                f"the error above. This means there is a consistency bug either in `_get_params` or in the "
-                f"`features.Image` path in `_transform`."
-            ) from exc
 
-        assert_close(
-            output_prototype_image,
-            output_prototype_tensor,
-            msg=lambda msg: f"Output for feature and tensor images is not equal: \n\n{msg}",
-            **closeness_kwargs,
-        )
+def check_call_consistency(
+    prototype_transform, legacy_transform, images=None, supports_pil=True, closeness_kwargs=None
+):
+    if images is None:
+        images = make_images(**DEFAULT_MAKE_IMAGES_KWARGS)
 
-        if image.ndim == 3 and supports_pil:
-            image_pil = to_image_pil(image)
+    closeness_kwargs = closeness_kwargs or dict()
 
-            try:
-                torch.manual_seed(0)
-                output_legacy_pil = legacy_transform(image_pil)
-            except Exception as exc:
-                raise pytest.UsageError(
-                    f"Transforming a PIL image with shape {image_repr} failed in the legacy transform with the "
-                    f"error above. If this transform does not support PIL images, set `supports_pil=False` on the "
-                    "`ConsistencyConfig`. "
-                ) from exc
-
-            try:
-                torch.manual_seed(0)
-                output_prototype_pil = prototype_transform(image_pil)
-            except Exception as exc:
-                raise AssertionError(
-                    f"Transforming a PIL image with shape {image_repr} failed in the prototype transform with "
-                    f"the error above. This means there is a consistency bug either in `_get_params` or in the "
-                    f"`PIL.Image.Image` path in `_transform`."
-                ) from exc
-
-            assert_close(
-                output_prototype_pil,
-                output_legacy_pil,
-                msg=lambda msg: f"PIL image consistency check failed with: \n\n{msg}",
-                **closeness_kwargs,
-            )
+    for image in images:
+        check_single_image_consistency(
+            prototype_transform,
+            legacy_transform,
+            image,
+            supports_pil=supports_pil,
+            closeness_kwargs=closeness_kwargs,
+        )
 
 
-@pytest.mark.parametrize(
-    ("config", "args_kwargs"),
-    [
-        pytest.param(
-            config, args_kwargs, id=f"{config.legacy_cls.__name__}-{idx:0{len(str(len(config.args_kwargs)))}d}"
+def make_call_consistency_params():
+    params = []
+    for config in CONSISTENCY_CONFIGS:
+        # Zero-pad the index, so the test ids of a config sort correctly
+        idx_width = len(str(len(config.args_kwargs)))
+        params.extend(
+            pytest.param(config, args_kwargs, id=f"{config.legacy_cls.__name__}-{idx:0{idx_width}d}")
+            for idx, args_kwargs in enumerate(config.args_kwargs)
         )
-        for config in CONSISTENCY_CONFIGS
-        for idx, args_kwargs in enumerate(config.args_kwargs)
-    ],
-)
+    return params
+
+
+CALL_CONSISTENCY_PARAMS = make_call_consistency_params()
+
+
+@pytest.mark.parametrize(("config", "args_kwargs"), CALL_CONSISTENCY_PARAMS)
 @pytest.mark.filterwarnings("ignore")
 def test_call_consistency(config, args_kwargs):
     args, kwargs = args_kwargs
@@ -698,6 +738,9 @@ class TestContainerTransforms:
         check_call_consistency(prototype_transform, legacy_transform)
 
 
+TO_TENSOR_DEPRECATION_WARNING_PATTERN = re.compile(re.escape("The transform `ToTensor()` is deprecated"))
+
+
 class TestToTensorTransforms:
     def test_pil_to_tensor(self):
         prototype_transform = prototype_transforms.PILToTensor()
@@ -709,7 +752,7 @@ class TestToTensorTransforms:
             assert_equal(prototype_transform(image_pil), legacy_transform(image_pil))
 
     def test_to_tensor(self):
-        with pytest.warns(UserWarning, match=re.escape("The transform `ToTensor()` is deprecated")):
+        with pytest.warns(UserWarning, match=TO_TENSOR_DEPRECATION_WARNING_PATTERN):
             prototype_transform = prototype_transforms.ToTensor()
         legacy_transform = legacy_transforms.ToTensor()
 
@@ -721,15 +764,38 @@ class TestToTensorTransforms:
             assert_equal(prototype_transform(image_numpy), legacy_transform(image_numpy))
 
 
+# None of the transforms below modifies its input inplace. Thus, all tests can share the same inputs.
+_AA_IMAGE_TENSOR = torch.randint(0, 256, size=(1, 3, 256, 256), dtype=torch.uint8)
+AA_INPUTS = [
+    _AA_IMAGE_TENSOR,
+    PIL.Image.new("RGB", (256, 256), 123),
+    features.Image(_AA_IMAGE_TENSOR),
+]
+
+
 class TestAATransforms:
-    @pytest.mark.parametrize(
-        "inpt",
-        [
-            torch.randint(0, 256, size=(1, 3, 256, 256), dtype=torch.uint8),
-            PIL.Image.new("RGB", (256, 256), 123),
-            features.Image(torch.randint(0, 256, size=(1, 3, 256, 256), dtype=torch.uint8)),
-        ],
-    )
+    def make_randint_values_with_magnitude(self, t):
+        # Values for the mocked `torch.randint` calls, such that the i-th call of both the stable and the new API picks
+        # the i-th op with a fixed magnitude bin
+        randint_values = []
+        for i, (magnitudes_fn, signed) in enumerate(t._AUGMENTATION_SPACE.values()):
+            magnitudes = magnitudes_fn(2, 0, 0)
+            # Stable API, op_index random call
+            randint_values.append(i)
+            # Stable API, random magnitude
+            if magnitudes is not None:
+                randint_values.append(5)
+            # Stable API, if signed there is another random call
+            if signed:
+                randint_values.append(0)
+            # New API, _get_random_item
+            randint_values.append(i)
+            # New API, random magnitude
+            if magnitudes is not None:
+                randint_values.append(5)
+        return randint_values
+
+    @pytest.mark.parametrize("inpt", AA_INPUTS)
     @pytest.mark.parametrize(
         "interpolation",
         [prototype_transforms.InterpolationMode.NEAREST, prototype_transforms.InterpolationMode.BILINEAR],
@@ -749,9 +815,10 @@ class TestAATransforms:
                 randint_values.append(0)
             # New API, _get_random_item
             randint_values.append(i)
-        randint_values = iter(randint_values)
 
-        mocker.patch("torch.randint", side_effect=lambda *arg, **kwargs: torch.tensor(next(randint_values)))
+        # An iterable `side_effect` returns its next element on every call. Iterating over a tensor gives 0-dim tensors,
+        # i.e. exactly what `torch.randint(..., size=())` returns
+        mocker.patch("torch.randint", side_effect=torch.tensor(randint_values))
         mocker.patch("torch.rand", return_value=1.0)
 
         for i in range(le):
@@ -760,14 +827,7 @@ class TestAATransforms:
 
             assert_close(expected_output, output, atol=1, rtol=0.1)
 
-    @pytest.mark.parametrize(
-        "inpt",
-        [
-            torch.randint(0, 256, size=(1, 3, 256, 256), dtype=torch.uint8),
-            PIL.Image.new("RGB", (256, 256), 123),
-            features.Image(torch.randint(0, 256, size=(1, 3, 256, 256), dtype=torch.uint8)),
-        ],
-    )
+    @pytest.mark.parametrize("inpt", AA_INPUTS)
     @pytest.mark.parametrize(
         "interpolation",
         [prototype_transforms.InterpolationMode.NEAREST, prototype_transforms.InterpolationMode.BILINEAR],
@@ -777,29 +837,9 @@ class TestAATransforms:
         t = prototype_transforms.TrivialAugmentWide(interpolation=interpolation)
 
         le = len(t._AUGMENTATION_SPACE)
-        keys = list(t._AUGMENTATION_SPACE.keys())
-        randint_values = []
-        for i in range(le):
-            # Stable API, op_index random call
-            randint_values.append(i)
-            key = keys[i]
-            # Stable API, random magnitude
-            aug_op = t._AUGMENTATION_SPACE[key]
-            magnitudes = aug_op[0](2, 0, 0)
-            if magnitudes is not None:
-                randint_values.append(5)
-            # Stable API, if signed there is another random call
-            if aug_op[1]:
-                randint_values.append(0)
-            # New API, _get_random_item
-            randint_values.append(i)
-            # New API, random magnitude
-            if magnitudes is not None:
-                randint_values.append(5)
+        randint_values = self.make_randint_values_with_magnitude(t)
 
-        randint_values = iter(randint_values)
-
-        mocker.patch("torch.randint", side_effect=lambda *arg, **kwargs: torch.tensor(next(randint_values)))
+        mocker.patch("torch.randint", side_effect=torch.tensor(randint_values))
         mocker.patch("torch.rand", return_value=1.0)
 
         for _ in range(le):
@@ -808,14 +848,7 @@ class TestAATransforms:
 
             assert_close(expected_output, output, atol=1, rtol=0.1)
 
-    @pytest.mark.parametrize(
-        "inpt",
-        [
-            torch.randint(0, 256, size=(1, 3, 256, 256), dtype=torch.uint8),
-            PIL.Image.new("RGB", (256, 256), 123),
-            features.Image(torch.randint(0, 256, size=(1, 3, 256, 256), dtype=torch.uint8)),
-        ],
-    )
+    @pytest.mark.parametrize("inpt", AA_INPUTS)
     @pytest.mark.parametrize(
         "interpolation",
         [prototype_transforms.InterpolationMode.NEAREST, prototype_transforms.InterpolationMode.BILINEAR],
@@ -826,30 +859,9 @@ class TestAATransforms:
         t = prototype_transforms.AugMix(interpolation=interpolation, mixture_width=1, chain_depth=1)
         t._sample_dirichlet = lambda t: t.softmax(dim=-1)
 
-        le = len(t._AUGMENTATION_SPACE)
-        keys = list(t._AUGMENTATION_SPACE.keys())
-        randint_values = []
-        for i in range(le):
-            # Stable API, op_index random call
-            randint_values.append(i)
-            key = keys[i]
-            # Stable API, random magnitude
-            aug_op = t._AUGMENTATION_SPACE[key]
-            magnitudes = aug_op[0](2, 0, 0)
-            if magnitudes is not None:
-                randint_values.append(5)
-            # Stable API, if signed there is another random call
-            if aug_op[1]:
-                randint_values.append(0)
-            # New API, _get_random_item
-            randint_values.append(i)
-            # New API, random magnitude
-            if magnitudes is not None:
-                randint_values.append(5)
+        randint_values = self.make_randint_values_with_magnitude(t)
 
-        randint_values = iter(randint_values)
-
-        mocker.patch("torch.randint", side_effect=lambda *arg, **kwargs: torch.tensor(next(randint_values)))
+        mocker.patch("torch.randint", side_effect=torch.tensor(randint_values))
         mocker.patch("torch.rand", return_value=1.0)
 
         expected_output = t_ref(inpt)
@@ -857,14 +869,7 @@ class TestAATransforms:
 
         assert_equal(expected_output, output)
 
-    @pytest.mark.parametrize(
-        "inpt",
-        [
-            torch.randint(0, 256, size=(1, 3, 256, 256), dtype=torch.uint8),
-            PIL.Image.new("RGB", (256, 256), 123),
-            features.Image(torch.randint(0, 256, size=(1, 3, 256, 256), dtype=torch.uint8)),
-        ],
-    )
+    @pytest.mark.parametrize("inpt", AA_INPUTS)
     @pytest.mark.parametrize(
         "interpolation",
         [prototype_transforms.InterpolationMode.NEAREST, prototype_transforms.InterpolationMode.BILINEAR],
@@ -883,16 +888,23 @@ class TestAATransforms:
         assert_equal(expected_output, output)
 
 
+@cache
 def import_transforms_from_references(reference):
-    ref_det_filepath = Path(__file__).parent.parent / "references" / reference / "transforms.py"
-    return SourceFileLoader(ref_det_filepath.stem, ref_det_filepath.as_posix()).load_module()
+    path = Path(__file__).parent.parent / "references" / reference / "transforms.py"
+    # Unlike the deprecated SourceFileLoader.load_module(), this does not register the module in sys.modules. Thus, the
+    # detection and segmentation references, that are both named 'transforms', no longer shadow each other.
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
 
 
 det_transforms = import_transforms_from_references("detection")
 
 
 class TestRefDetTransforms:
-    def make_datapoints(self, with_mask=True):
+    @staticmethod
+    def make_datapoints(with_mask=True):
         size = (600, 800)
         num_objects = 22
 
@@ -906,7 +918,7 @@ class TestRefDetTransforms:
 
         yield (pil_image, target)
 
-        tensor_image = torch.Tensor(make_image(size=size, color_space=features.ColorSpace.RGB))
+        tensor_image = make_image(size=size, color_space=features.ColorSpace.RGB).as_subclass(torch.Tensor)
         target = {
             "boxes": make_bounding_box(spatial_size=size, format="XYXY", extra_dims=(num_objects,), dtype=torch.float),
             "labels": make_label(extra_dims=(num_objects,), categories=80),
@@ -926,6 +938,13 @@ class TestRefDetTransforms:
 
         yield (feature_image, target)
 
+    # Creating the datapoints, especially the masks, is fairly expensive. Thus, we only create them once for each set of
+    # keyword arguments and share them between all parametrizations.
+    @classmethod
+    @cache
+    def make_cached_datapoints(cls, **data_kwargs):
+        return list(cls.make_datapoints(**data_kwargs))
+
     @pytest.mark.parametrize(
         "t_ref, t, data_kwargs",
         [
@@ -950,7 +969,9 @@ class TestRefDetTransforms:
         ],
     )
     def test_transform(self, t_ref, t, data_kwargs):
-        for dp in self.make_datapoints(**data_kwargs):
+        for image, target in self.make_cached_datapoints(**data_kwargs):
+            # The reference transforms update the target inplace. Thus, we need to copy it to not affect other tests.
+            dp = (image, {key: value.clone() for key, value in target.items()})
 
             # We should use prototype transform first as reference transform performs inplace target update
             torch.manual_seed(12)
@@ -991,28 +1012,30 @@ class PadIfSmaller(prototype_transforms.Transform):
 
 class TestRefSegTransforms:
     def make_datapoints(self, supports_pil=True, image_dtype=torch.uint8):
-        size = (256, 460)
+        size = (64, 116)
         num_categories = 21
 
-        conv_fns = []
-        if supports_pil:
-            conv_fns.append(to_image_pil)
-        conv_fns.extend([torch.Tensor, lambda x: x])
-
-        for conv_fn in conv_fns:
-            feature_image = make_image(size=size, color_space=features.ColorSpace.RGB, dtype=image_dtype)
-            feature_mask = make_segmentation_mask(size=size, num_categories=num_categories, dtype=torch.uint8)
+        feature_image = make_image(size=size, color_space=features.ColorSpace.RGB, dtype=image_dtype)
+        feature_mask = make_segmentation_mask(size=size, num_categories=num_categories, dtype=torch.uint8)
 
-            dp = (conv_fn(feature_image), feature_mask)
-            dp_ref = (
-                to_image_pil(feature_image) if supports_pil else torch.Tensor(feature_image),
-                to_image_pil(feature_mask),
-            )
+        # We pass the same image in all supported input types. Thus, each conversion is only needed once and the PIL image
+        # can be shared between the inputs for the prototype and the reference transform.
+        tensor_image = feature_image.as_subclass(torch.Tensor)
+        if supports_pil:
+            image_ref = to_image_pil(feature_image)
+            images = [image_ref, tensor_image, feature_image]
+        else:
+            image_ref = tensor_image
+            images = [tensor_image, feature_image]
+        dp_ref = (image_ref, to_image_pil(feature_mask))
 
-            yield dp, dp_ref
+        for image in images:
+            yield (image, feature_mask), dp_ref
 
     def set_seed(self, seed=12):
-        torch.manual_seed(seed)
+        # All inputs are on the CPU. Thus, there is no need to also seed the CUDA generators like torch.manual_seed does.
+        torch.default_generator.manual_seed(seed)
+        # The segmentation references draw their random parameters from Python's random module.
         random.seed(seed)
 
     def check(self, t, t_ref, data_kwargs=None):
@@ -1165,7 +1188,7 @@ class TestRefSegTransforms:
     ],
 )
 def test_dispatcher_signature_consistency(legacy_dispatcher, name_only_params):
-    legacy_signature = inspect.signature(legacy_dispatcher)
+    legacy_signature = get_signature(legacy_dispatcher)
     legacy_params = list(legacy_signature.parameters.values())[1:]
 
     try:
@@ -1175,7 +1198,7 @@ def test_dispatcher_signature_consistency(legacy_dispatcher, name_only_params):
             f"Legacy dispatcher `F.{legacy_dispatcher.__name__}` has no prototype equivalent"
         ) from None
 
-    prototype_signature = inspect.signature(prototype_dispatcher)
+    prototype_signature = get_signature(prototype_dispatcher)
     prototype_params = list(prototype_signature.parameters.values())[1:]
 
     # Some dispatchers got extra parameters. This makes sure they have a default argument and thus are BC. We don't
@@ -1189,12 +1212,17 @@ def test_dispatcher_signature_consistency(legacy_dispatcher, name_only_params):
         assert param.default is not param.empty
 
     # Some annotations were changed mostly to supersets of what was there before. Plus, some legacy dispatchers had no
-    # annotations. In these cases we simply drop the annotation and default argument from the comparison
-    for prototype_param, legacy_param in zip(prototype_params, legacy_params):
+    # annotations. In these cases we simply drop the annotation and default argument from the comparison. We use
+    # `Parameter.replace`, since the parameters belong to the cached signatures and thus must not be modified.
+    for idx, (prototype_param, legacy_param) in enumerate(zip(prototype_params, legacy_params)):
         if legacy_param.name in name_only_params:
-            prototype_param._annotation = prototype_param._default = inspect.Parameter.empty
-            legacy_param._annotation = legacy_param._default = inspect.Parameter.empty
+            prototype_params[idx] = prototype_param.replace(
+                annotation=inspect.Parameter.empty, default=inspect.Parameter.empty
+            )
+            legacy_params[idx] = legacy_param.replace(
+                annotation=inspect.Parameter.empty, default=inspect.Parameter.empty
+            )
         elif legacy_param.annotation is inspect.Parameter.empty:
-            prototype_param._annotation = inspect.Parameter.empty
+            prototype_params[idx] = prototype_param.replace(annotation=inspect.Parameter.empty)
 
     assert prototype_params == legacy_params